@@ -2,8 +2,11 @@
 # -*- coding: utf-8 -*-
 """
 Real‑time quotes → Azure SQL
- - one persistent DB connection per worker thread
+ - one persistent DB connection per thread (main + writers)
  - global token‑bucket rate limiter
+ - fetch workers hand rows to DB_WRITERS writer threads through a bounded queue
+ - batched ``fast_executemany`` inserts, one commit per BATCH_SIZE rows
+   (or per FLUSH_SECS, whichever comes first)
  
 Change REQUESTS_PER_SEC below to suit your EODHD plan.
 
@@ -15,84 +18,313 @@ timezone‑aware ``datetime.fromtimestamp(..., timezone.utc)``.
 
 from __future__ import annotations
 
+import atexit
 import logging
+import math
 import os
+import queue
+import random
 import struct
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timezone
-from typing import Any, Optional
-from urllib.parse import quote_plus
+from email.utils import parsedate_to_datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+from urllib.parse import quote, urlencode
 
-import pandas as pd
+import httpx
+import orjson
 import pyodbc
-import requests
 from azure.identity import DefaultAzureCredential
-from sqlalchemy import create_engine
 
 # --------------------------------------------------------------------------- #
 #               ──  EDIT THIS VALUE TO THROTTLE THE API  ──
 REQUESTS_PER_SEC: int = 50  # allowed outbound requests per second
+BATCH_SIZE: int = 500        # rows per executemany / commit
+FLUSH_SECS: float = 5.0      # max age of a partial batch before it is written
+FETCH_WORKERS: int = 2 * REQUESTS_PER_SEC  # HTTP threads (~2 s of requests in flight)
+DB_WRITERS: int = 1          # SQL writer threads/connections; keep low (≤ 8)
 # --------------------------------------------------------------------------- #
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s  %(levelname)-8s  %(message)s",
+T = TypeVar("T")
+R = TypeVar("R")
+
+BASE_URL = "https://eodhd.com/api/real-time"
+QUOTE_FIELDS = ("open", "high", "low", "close", "volume")  # INSERT column order
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE = 1.0   # seconds; first retry waits up to this long
+BACKOFF_CAP = 30.0   # seconds; upper bound of the backoff window
+
+# Worker threads only enqueue records; one listener thread does the writing.
+_log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter("%(asctime)s  %(levelname)-8s  %(threadName)s  %(message)s")
 )
+_log_listener = QueueListener(_log_queue, _log_handler)
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # else basicConfig adds BASIC_FORMAT
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)  # flushes pending records on exit
 
 # --------------------------------------------------------------------------- #
 # Token‑bucket rate limiter
 # --------------------------------------------------------------------------- #
 
-def start_rate_limiter(rps: int) -> threading.Semaphore:
-    """Return a semaphore that allows at most *rps* acquisitions per second."""
-    bucket = threading.BoundedSemaphore(rps)
+class TokenBucket:
+    """Thread‑safe token bucket refilled lazily from the monotonic clock.
 
-    def refill() -> None:
-        while True:
-            time.sleep(1)
-            # keep releasing until the bucket is full
-            while bucket._value < rps:  # pylint: disable=protected-access
-                try:
-                    bucket.release()
-                except ValueError:
-                    break
+    Tokens accrue at *rps* per second up to *capacity*; ``acquire`` blocks
+    until one is available. No background thread is needed.
 
-    threading.Thread(target=refill, daemon=True).start()
-    return bucket
+    The rate adapts AIMD‑style: ``throttle`` (on a 429) halves it, at most
+    once per second, and every ``reward`` (on a success) adds *increase*
+    back, up to the configured ceiling.
+    """
+
+    def __init__(
+        self,
+        rps: float,
+        capacity: Optional[int] = None,
+        min_rps: float = 1.0,
+        increase: float = 0.1,
+    ) -> None:
+        self.max_rps = float(rps)
+        self.min_rps = min(float(min_rps), self.max_rps)
+        self.increase = increase
+        self.rps = self.max_rps
+        self.capacity = capacity if capacity is not None else max(1, int(rps))
+        self.tokens = float(self.capacity)
+        self.last = time.monotonic()
+        self._last_cut = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rps)
+        self.last = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rps
+            time.sleep(delay)
+
+    def throttle(self) -> None:
+        """Multiplicative decrease after the server pushed back."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_cut < 1.0:
+                return  # in‑flight requests from the same burst; cut once
+            self._refill(now)
+            self._last_cut = now
+            self.rps = max(self.min_rps, self.rps * 0.5)
+            self.tokens = min(self.tokens, 0.0)
+        logging.warning("Rate limited — slowing to %.1f request(s) per second.", self.rps)
+
+    def reward(self) -> None:
+        """Additive increase after a successful request."""
+        if self.rps >= self.max_rps:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rps = min(self.max_rps, self.rps + self.increase)
 
 
 # --------------------------------------------------------------------------- #
 # Thread‑local SQL connection helper
 # --------------------------------------------------------------------------- #
 
+pyodbc.pooling = True  # driver‑manager pooling; must be set before the first connect
+
 thread_local = threading.local()
+_open_conns: list[pyodbc.Connection] = []  # type: ignore[name‑defined]
+_open_conns_lock = threading.Lock()
+
 
+def get_thread_conn(conn_str: str, get_attrs: Callable[[], dict[int, bytes]]) -> pyodbc.Connection:  # type: ignore[name‑defined]
+    """Give each worker thread its own persistent pyodbc connection.
 
-def get_thread_conn(conn_str: str, attrs: dict[str, Any]) -> pyodbc.Connection:  # type: ignore[name‑defined]
-    """Give each worker thread its own persistent pyodbc connection."""
+    *get_attrs* is called only when a connection is opened, so a long run
+    picks up a fresh access token on reconnect.
+    """
     if not hasattr(thread_local, "conn"):
-        logging.debug("Opening SQL connection in %s", threading.current_thread().name)
+        logging.debug("Opening SQL connection")
         thread_local.conn = pyodbc.connect(  # type: ignore[attr‑defined]
             conn_str,
-            attrs_before=attrs,
+            attrs_before=get_attrs(),
             autocommit=False,
             timeout=5,
         )
+        with _open_conns_lock:
+            _open_conns.append(thread_local.conn)
     return thread_local.conn  # type: ignore[return‑value]
 
 
+def get_thread_cursor(conn_str: str, get_attrs: Callable[[], dict[int, bytes]]) -> pyodbc.Cursor:  # type: ignore[name‑defined]
+    """Return this thread's cached insert cursor.
+
+    pyodbc only re‑prepares when the SQL text changes, so reusing one cursor
+    keeps the INSERT prepared across batches.
+    """
+    if not hasattr(thread_local, "cur"):
+        thread_local.cur = get_thread_conn(conn_str, get_attrs).cursor()
+        thread_local.cur.fast_executemany = True
+    return thread_local.cur  # type: ignore[return‑value]
+
+
+def rollback_thread_conn() -> bool:
+    """Discard whatever a failed batch left in this thread's transaction.
+
+    If the connection itself is gone, drop it so the next batch reconnects.
+    Returns True only if the connection is still usable.
+    """
+    conn = getattr(thread_local, "conn", None)
+    if conn is None:
+        return False
+    try:
+        conn.rollback()
+        return True
+    except pyodbc.Error:  # type: ignore[attr‑defined]
+        logging.warning("SQL connection lost — reconnecting on the next batch.")
+        del thread_local.conn
+        if hasattr(thread_local, "cur"):
+            del thread_local.cur
+        with _open_conns_lock:
+            if conn in _open_conns:
+                _open_conns.remove(conn)
+        try:
+            conn.close()
+        except pyodbc.Error:  # type: ignore[attr‑defined]
+            pass
+        return False
+
+
+@atexit.register
+def close_thread_conns() -> None:
+    """Close every connection handed out by :func:`get_thread_conn`."""
+    with _open_conns_lock:
+        while _open_conns:
+            try:
+                _open_conns.pop().close()
+            except pyodbc.Error:  # type: ignore[attr‑defined]
+                pass
+
+
+def clear_table(conn: pyodbc.Connection, table: str) -> None:  # type: ignore[name‑defined]
+    """Empty *table*: ``TRUNCATE`` if allowed, else a table‑locked ``DELETE``."""
+    try:
+        conn.execute(f"TRUNCATE TABLE {table};")
+    except pyodbc.Error as e:  # type: ignore[attr‑defined]
+        conn.rollback()
+        logging.warning("TRUNCATE on %s failed (%s); falling back to DELETE.", table, e)
+        # still fully logged; TABLOCK just takes the table lock up front (no
+        # row‑lock escalation) and lets emptied heap pages be deallocated
+        conn.execute(f"SET NOCOUNT ON; DELETE FROM {table} WITH (TABLOCK);")
+    conn.commit()
+
+
+# Declared parameter types for the plain INSERT. Without them fast_executemany
+# infers the bindings from the first row, which breaks on leading NULLs.
+# The OHLCV binds are strict: values must be floats or None, which the worker
+# guarantees via _num(). A stray string would fail the batch, and
+# write_or_bisect() would then drop only that row.
+INSERT_INPUT_SIZES = [
+    (pyodbc.SQL_WVARCHAR, 64, 0),         # ext2_ticker
+    (pyodbc.SQL_DOUBLE, 0, 0),            # open
+    (pyodbc.SQL_DOUBLE, 0, 0),            # high
+    (pyodbc.SQL_DOUBLE, 0, 0),            # low
+    (pyodbc.SQL_DOUBLE, 0, 0),            # close
+    (pyodbc.SQL_DOUBLE, 0, 0),            # volume (bigint column; server converts)
+    (pyodbc.SQL_WVARCHAR, 8, 0),          # currency
+    (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7),   # timestamp_created_utc
+    (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7),   # timestamp_read_utc
+]
+
+
+def insert_batch(cur: pyodbc.Cursor, insert_sql: str, rows: list[tuple]) -> int:  # type: ignore[name‑defined]
+    """Insert *rows* with a single ``executemany`` and one commit."""
+    cur.setinputsizes(INSERT_INPUT_SIZES)
+    cur.executemany(insert_sql, rows)
+    cur.connection.commit()
+    return len(rows)
+
+
+def insert_batch_tvp(cur: pyodbc.Cursor, call_sql: str, rows: list[tuple]) -> int:  # type: ignore[name‑defined]
+    """Ship *rows* to a stored procedure as one table‑valued parameter."""
+    cur.execute(call_sql, (rows,))
+    cur.connection.commit()
+    return len(rows)
+
+
+def write_or_bisect(
+    write_batch: Callable[[pyodbc.Cursor, str, list[tuple]], int],  # type: ignore[name‑defined]
+    get_cursor: Callable[[], pyodbc.Cursor],  # type: ignore[name‑defined]
+    sql: str,
+    rows: list[tuple],
+) -> int:
+    """Write *rows*; if the server rejects a value, split the batch and retry.
+
+    A single unconvertible value fails the whole ``executemany``, so halving
+    down to one row drops only the bad rows instead of the entire batch.
+    Only data / constraint errors (SQLSTATE class 22 / 23) are split; anything
+    else (permissions, missing table, wrong columns) would fail every half
+    too, so the batch is dropped with a single log line.
+    """
+    try:
+        return write_batch(get_cursor(), sql, rows)
+    except pyodbc.Error as e:  # type: ignore[attr‑defined]
+        alive = rollback_thread_conn()
+        sqlstate = str(e.args[0]) if e.args else ""
+        if not alive or len(rows) == 1 or sqlstate[:2] not in ("22", "23"):
+            logging.error("Insert of %d row(s) failed (first: %s): %s", len(rows), rows[0][0], e)
+            return 0
+    mid = len(rows) // 2
+    return (
+        write_or_bisect(write_batch, get_cursor, sql, rows[:mid])
+        + write_or_bisect(write_batch, get_cursor, sql, rows[mid:])
+    )
+
+
 # --------------------------------------------------------------------------- #
 # Azure‑AD token decoration for pyodbc
 # --------------------------------------------------------------------------- #
 
+SQL_COPT_SS_ACCESS_TOKEN = 1256  # pyodbc constant (undocumented)
+_I32 = struct.Struct("=i").pack  # length prefix of the token struct
+
+
 def make_attrs(access_token: str) -> dict[int, bytes]:
-    SQL_COPT_SS_ACCESS_TOKEN = 1256  # pyodbc constant (undocumented)
     enc = access_token.encode("utf-16-le")
-    token_struct = struct.pack("=i", len(enc)) + enc
-    return {SQL_COPT_SS_ACCESS_TOKEN: token_struct}
+    return {SQL_COPT_SS_ACCESS_TOKEN: _I32(len(enc)) + enc}
+
+
+class AccessTokenCache:
+    """Hand out pyodbc attrs for a cached AAD token, refreshed near expiry."""
+
+    def __init__(self, cred: DefaultAzureCredential, scope: str, margin: int = 300) -> None:
+        self.cred = cred
+        self.scope = scope
+        self.margin = margin
+        self._expires_on = 0
+        self._attrs: dict[int, bytes] = {}
+        self._lock = threading.Lock()
+
+    def attrs(self) -> dict[int, bytes]:
+        with self._lock:
+            if time.time() >= self._expires_on - self.margin:
+                token = self.cred.get_token(self.scope)
+                self._expires_on = token.expires_on
+                self._attrs = make_attrs(token.token)
+                logging.debug("Acquired SQL access token (expires %d).", token.expires_on)
+            return self._attrs
 
 
 # --------------------------------------------------------------------------- #
@@ -107,59 +339,144 @@ def parse_epoch_to_utc(ts_raw: Any) -> Optional[datetime]:
     try:
         if ts_raw is None:
             return None
-        ts_int = int(ts_raw)
-        return datetime.fromtimestamp(ts_int, timezone.utc)
-    except (ValueError, TypeError, OSError):
-        # ValueError → cannot cast / wrong base‑10 input
-        # TypeError  → non‑castable type (dict, list, etc.)
-        # OSError    → out‑of‑range on some platforms
+        return datetime.fromtimestamp(float(ts_raw), timezone.utc)
+    except (ValueError, TypeError, OSError, OverflowError):
+        # ValueError    → cannot cast / NaN
+        # TypeError     → non‑castable type (dict, list, etc.)
+        # OSError       → out‑of‑range on some platforms
+        # OverflowError → inf / far out of range
+        return None
+
+
+def _num(value: Any) -> Optional[float]:
+    """Return *value* as a finite float, or *None* for ``"NA"``, ``""`` etc."""
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
         return None
+    return f if math.isfinite(f) else None
 
 
 # --------------------------------------------------------------------------- #
 # HTTP helper (rate‑limited)
 # --------------------------------------------------------------------------- #
 
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a ``Retry-After`` header (delta or HTTP‑date).
+
+    Delta‑seconds must be a plain non‑negative integer, as in RFC 9110; the
+    result is clamped to BACKOFF_CAP so a hostile or broken header cannot
+    park a fetch thread for hours (or overflow ``time.sleep``).
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isascii() and value.isdigit():
+        return float(min(BACKOFF_CAP, int(value)))
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return min(BACKOFF_CAP, max(0.0, (when - datetime.now(timezone.utc)).total_seconds()))
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Exponential backoff with full jitter, never shorter than ``Retry-After``.
+
+    Jitter spreads the retries of concurrent workers that hit the limit at
+    the same moment instead of sending them back in lock‑step.
+    """
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)))
+    return max(delay, parse_retry_after(retry_after) or 0.0)
+
+
+def make_client(pool_size: int) -> httpx.Client:
+    """Return a keep‑alive HTTP/2 client shared by all fetch workers.
+
+    With HTTP/2 the concurrent requests are multiplexed over one TLS
+    connection; *pool_size* only matters if the server falls back to 1.1.
+    """
+    return httpx.Client(
+        http2=True,
+        headers={"Accept": "application/json"},
+        follow_redirects=False,  # the API answers directly; a redirect is an error
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        # fail fast on a dead connect, allow a slow quote to finish
+        timeout=httpx.Timeout(10.0, connect=3.05),
+    )
+
+
 def fetch_realtime_data(
     ticker: str,
-    api_token: str,
-    rate_sem: threading.Semaphore,
+    url_tpl: str,
+    bucket: TokenBucket,
+    client: httpx.Client,
     max_retries: int = 3,
-    session: Optional[requests.Session] = None,
 ) -> Optional[dict[str, Any]]:
-    url = f"https://eodhd.com/api/real-time/{ticker}"
-    params = {"api_token": api_token, "fmt": "json"}
+    """GET the real‑time quote for *ticker*.
 
-    session = session or requests
+    *url_tpl* is the full request URL with ``{}`` in place of the ticker.
+    """
+    url = url_tpl.format(quote(ticker, safe=""))
 
     for attempt in range(1, max_retries + 1):
-        rate_sem.acquire()
+        bucket.acquire()
         try:
-            resp = session.get(url, params=params, timeout=10)
-            resp.raise_for_status()
-            return resp.json()
-
-        except requests.exceptions.HTTPError as he:  # type: ignore[attr‑defined]
-            if he.response is not None and he.response.status_code == 429 and attempt < max_retries:
-                retry_after_hdr = he.response.headers.get("Retry-After")
-                try:
-                    wait = max(1, int(retry_after_hdr))
-                except (TypeError, ValueError):
-                    wait = 5
-                logging.warning("%s → 429, waiting %ds (retry %d/%d)", ticker, wait, attempt, max_retries)
-                time.sleep(wait)
-                continue
-            status = he.response.status_code if he.response is not None else "N/A"
-            logging.error("%s → HTTP %s", ticker, status)
-            return None
-
+            resp = client.get(url)
         except Exception as e:  # pylint: disable=broad‑except
             logging.error("%s → network error: %s", ticker, e)
             return None
 
+        status = resp.status_code
+        if status == 200:
+            bucket.reward()
+            try:
+                return orjson.loads(resp.content)
+            except orjson.JSONDecodeError as je:
+                logging.error("%s → invalid JSON: %s", ticker, je)
+                return None
+
+        if status == 429:
+            bucket.throttle()
+        if status in RETRY_STATUSES and attempt < max_retries:
+            delay = backoff_delay(attempt, resp.headers.get("Retry-After"))
+            logging.warning("%s → %d, waiting %.1fs (retry %d/%d)", ticker, status, delay, attempt, max_retries)
+            time.sleep(delay)
+            continue
+        logging.error("%s → HTTP %s", ticker, status)
+        return None
+
     return None
 
 
+# --------------------------------------------------------------------------- #
+# Bounded submission
+# --------------------------------------------------------------------------- #
+
+def bounded_map(
+    exe: ThreadPoolExecutor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    limit: int,
+) -> Iterator[R]:
+    """Like ``exe.map`` but with at most *limit* futures outstanding.
+
+    Results are yielded in completion order. ``Executor.map`` submits every
+    item up front, which pins one Future per ticker for the whole run.
+    """
+    pending: set[Future[R]] = set()
+    for item in items:
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+        pending.add(exe.submit(fn, item))
+    for fut in as_completed(pending):
+        yield fut.result()
+
+
 # --------------------------------------------------------------------------- #
 # Main
 # --------------------------------------------------------------------------- #
@@ -171,19 +488,19 @@ def main() -> None:
     api_token = os.getenv("EODHD_API_TOKEN")
     target_table = os.getenv("TARGET_TABLE")
     ticker_sql = os.getenv("TICKER_SQL")
+    insert_proc = os.getenv("INSERT_PROC")  # optional TVP stored procedure
 
     if not all((db_server, db_name, api_token, target_table, ticker_sql)):
         logging.critical("Missing one or more required environment variables.")
         sys.exit(1)
 
     # ---------- global rate limiter ----------
-    rate_sem = start_rate_limiter(REQUESTS_PER_SEC)
+    bucket = TokenBucket(REQUESTS_PER_SEC)
     logging.info("Global rate limit set to %d request(s) per second.", REQUESTS_PER_SEC)
 
     # ---------- Azure AD access token ----------
-    cred = DefaultAzureCredential()
-    token = cred.get_token("https://database.windows.net/.default")
-    attrs = make_attrs(token.token)
+    tokens = AccessTokenCache(DefaultAzureCredential(), "https://database.windows.net/.default")
+    tokens.attrs()  # fail fast if no credential is available
 
     # ---------- connection strings ----------
     odbc_str = (
@@ -193,14 +510,14 @@ def main() -> None:
         "Encrypt=yes;"
         "TrustServerCertificate=no;"
     )
-    engine = create_engine(
-        f"mssql+pyodbc:///?odbc_connect={quote_plus(odbc_str)}",
-        connect_args={"attrs_before": attrs},
-    )
+    # used for the ticker query and the TRUNCATE; each writer opens its own
+    conn = get_thread_conn(odbc_str, tokens.attrs)
 
     # ---------- fetch tickers ----------
-    df = pd.read_sql(ticker_sql, engine)
-    tickers = df.iloc[:, 0].dropna().tolist()
+    cur = conn.cursor()
+    cur.execute(ticker_sql)
+    tickers = [r[0] for r in cur if r[0] is not None]
+    cur.close()
     if not tickers:
         logging.warning("No tickers to process — exiting.")
         return
@@ -208,64 +525,114 @@ def main() -> None:
 
     # ---------- clear target table ----------
     logging.info("Clearing %s ...", target_table)
-    with pyodbc.connect(odbc_str, attrs_before=attrs) as conn:  # type: ignore[arg‑type]
-        conn.execute(f"DELETE FROM {target_table};")
-        conn.commit()
+    clear_table(conn, target_table)
 
     # ---------- prepared insert ----------
-    insert_sql = f"""
-    INSERT INTO {target_table} (
-        ext2_ticker,
-        [open], high, low, [close], volume,
-        currency,
-        timestamp_created_utc,
-        timestamp_read_utc
-    )
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
+    if insert_proc:
+        insert_sql = f"{{CALL {insert_proc}(?)}}"
+        write_batch = insert_batch_tvp
+        logging.info("Writing batches through %s (TVP).", insert_proc)
+    else:
+        insert_sql = f"""
+        INSERT INTO {target_table} (
+            ext2_ticker,
+            [open], high, low, [close], volume,
+            currency,
+            timestamp_created_utc,
+            timestamp_read_utc
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        write_batch = insert_batch
 
-    session = requests.Session()
+    client = make_client(FETCH_WORKERS)
+    url_tpl = f"{BASE_URL}/{{}}?" + urlencode({"api_token": api_token, "fmt": "json"})
+    rows_q: queue.Queue[Optional[tuple]] = queue.Queue(maxsize=2 * BATCH_SIZE)
 
     # ---------- worker function ----------
     def worker(ticker: str) -> int:
-        data = fetch_realtime_data(ticker, api_token, rate_sem, session=session)
+        """Queue the quote for *ticker*; return 1 if it had no OHLCV values."""
+        data = fetch_realtime_data(ticker, url_tpl, bucket, client)
         if not data:
             return 0
 
-        now = datetime.now(timezone.utc)
-        read = parse_epoch_to_utc(data.get("timestamp")) or now
-
-        row = (
-            ticker,
-            data.get("open"),
-            data.get("high"),
-            data.get("low"),
-            data.get("close"),
-            data.get("volume"),
-            None,  # currency → NULL
-            now,
-            read,
-        )
+        # non‑numeric placeholders ("NA", "") become NULL instead of failing the batch
+        ohlcv = tuple(_num(data.get(k)) for k in QUOTE_FIELDS)
+        if all(v is None for v in ohlcv):
+            return 1  # delisted / unknown ticker → nothing worth inserting
 
+        read = parse_epoch_to_utc(data.get("timestamp"))
+
+        # currency → NULL; timestamp_created_utc is stamped per batch in flush()
+        rows_q.put((ticker, *ohlcv, None, read))
+        return 0
+
+    # ---------- batched insert ----------
+    def flush(batch: list[tuple]) -> int:
+        now = datetime.now(timezone.utc)
+        rows = [(*r[:-1], now, r[-1] or now) for r in batch]
         try:
-            conn = get_thread_conn(odbc_str, attrs)
-            cur = conn.cursor()
-            cur.execute(insert_sql, row)
-            conn.commit()
-            return 1
+            return write_or_bisect(
+                write_batch, lambda: get_thread_cursor(odbc_str, tokens.attrs), insert_sql, rows
+            )
         except Exception as e:  # pylint: disable=broad‑except
-            logging.error("Insert failed for %s: %s", ticker, e)
+            logging.error("Insert of %d row(s) failed: %s", len(batch), e)
+            rollback_thread_conn()
             return 0
 
-    # ---------- parallel execution ----------
-    max_workers = 25
-    total = 0
-    logging.info("Processing %d tickers with %d workers ...", len(tickers), max_workers)
+    # ---------- writer threads ----------
+    def writer() -> int:
+        """Drain *rows_q* until the sentinel; flush when full or FLUSH_SECS old."""
+        try:
+            # log in while the first quotes are fetched; on failure flush() retries
+            get_thread_cursor(odbc_str, tokens.attrs)
+        except Exception as e:  # pylint: disable=broad‑except
+            logging.error("Could not open writer connection: %s", e)
+
+        inserted = 0
+        batch: list[tuple] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                row = rows_q.get(timeout=timeout)
+            except queue.Empty:
+                inserted += flush(batch)
+                batch = []
+                continue
+            if row is None:
+                break
+            if not batch:
+                deadline = time.monotonic() + FLUSH_SECS
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                inserted += flush(batch)
+                batch = []
+        if batch:
+            inserted += flush(batch)
+        return inserted
+
+    # ---------- parallel fetch ----------
+    logging.info(
+        "Processing %d tickers with %d fetch worker(s) and %d writer(s) ...",
+        len(tickers), FETCH_WORKERS, DB_WRITERS,
+    )
 
-    with ThreadPoolExecutor(max_workers=max_workers) as exe:
-        futs = {exe.submit(worker, t): t for t in tickers}
-        for fut in as_completed(futs):
-            total += fut.result()
+    skipped = 0
+    with ThreadPoolExecutor(max_workers=DB_WRITERS, thread_name_prefix="sql-writer") as db_pool:
+        writers = [db_pool.submit(writer) for _ in range(DB_WRITERS)]
+        try:
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch") as fetch_pool:
+                for res in bounded_map(fetch_pool, worker, tickers, 2 * FETCH_WORKERS):
+                    skipped += res
+        finally:
+            client.close()
+            for _ in writers:
+                rows_q.put(None)  # one sentinel per writer → flush the tail and exit
+    total = sum(w.result() for w in writers)
+
+    if skipped:
+        logging.info("Skipped %d ticker(s) with no OHLCV data.", skipped)
 
     logging.info("Done. %d rows inserted into %s.", total, target_table)
 